@@ -12,14 +12,57 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import json
+import functools
+import http.cookiejar
+import itertools
+import os
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from RwsSet import RwsSet
-from jsonschema import validate
-from urllib.request import urlopen
-from urllib.request import Request
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
 from publicsuffix2 import PublicSuffixList
 
 WELL_KNOWN = "/.well-known/related-website-set.json"
+# Schema that the well-known file of a set primary must follow, as given in
+# Well-Known-Specification.md
+WELL_KNOWN_SCHEMA_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "WELL_KNOWN_SCHEMA.json")
+HTTPS = "https://"
+ADS_TXT = "/ads.txt"
+# Seconds to wait on a site before a request is abandoned
+REQUEST_TIMEOUT = 10
+# Errors from unreachable service sites that are expected and not reported
+EXCEPTION_RETRIES = "Max retries exceeded with url: /"
+EXCEPTION_RETRIES_ADS_TXT = "Max retries exceeded with url: /ads.txt"
+EXCEPTION_TIMEOUT = f"Read timed out. (read timeout={REQUEST_TIMEOUT})"
+# Number of worker threads (and pooled connections) used by the network checks
+MAX_WORKERS = 32
+# Seconds a well-known response is kept in the http cache after it was last
+# fetched or confirmed unchanged
+HTTP_CACHE_MAX_AGE = 86400
+
+@functools.lru_cache(maxsize=None)
+def load_schema_validator(schema_file):
+    """Loads a schema file and builds a validator for it
+
+    The schema is read, checked against its metaschema, and compiled into a 
+    validator once per schema_file; later calls return the cached validator.
+
+    Args:
+        schema_file: path to the json schema
+    Returns:
+        jsonschema.protocols.Validator
+    Raises:
+        jsonschema.exceptions.SchemaError if the schema itself is invalid
+    """
+    with open(schema_file) as f:
+        SCHEMA = json.loads(f.read())
+    cls = validator_for(SCHEMA)
+    cls.check_schema(SCHEMA)
+    return cls(SCHEMA)
 
 class RwsCheck:
 
@@ -30,27 +73,81 @@ class RwsCheck:
     submitted related website sets
     etlds: A string of effective top level domains read from public suffix list
     icanns: A set of domains associated with country codes
+    icanns_with_com: icanns with "com" added, the TLDs allowed for aliases of
+                     a site whose own TLD is a country code
     schema: Static. Stores schema for format the canonical_sites should follow
     error_list: Stores all exceptions and issues generated by the checks. This
                 allows the issues to be shared in full when iterated through
                 without any given check failing halfway through and not 
                 catching other issues. 
+    session: A requests.Session shared by all network checks, so that 
+             connections are pooled and reused across sites. It does not 
+             store cookies.
+    well_known_cache: Maps each url read by open_and_load_json to its json,
+                      or to the exception raised when reading it, so that no
+                      url is requested twice in a run
+    well_known_schema_file: Path of the json schema that the well-known file
+                            of a set primary must follow
+    http_cache_file: Optional path of a json file that persists well-known
+                     responses between runs
+    http_cache: Maps each url with an ETag or Last-Modified header to those
+                headers and its json, as read from and saved to 
+                http_cache_file. Used to make conditional get requests.
   """
     
 
-    def __init__(self, rws_sites: json, etlds: PublicSuffixList, icanns: set):
+    def __init__(self, rws_sites: json, etlds: PublicSuffixList, icanns: set,
+                 http_cache_file: str = None,
+                 well_known_schema_file: str = WELL_KNOWN_SCHEMA_FILE):
         """Stores the input from canonical_sites, effective_tld_names.dat, and 
-        ICANN_domains into the RwsCheck object"""
+        ICANN_domains into the RwsCheck object, and loads the http cache from
+        http_cache_file if one is given"""
         self.rws_sites = rws_sites
+        self.well_known_schema_file = well_known_schema_file
         self.etlds = etlds
-        self.icanns = icanns
+        self.icanns = frozenset(icanns)
+        self.icanns_with_com = self.icanns | {"com"}
         self.error_list = []
+        self.session = requests.Session()
+        # Only connections are shared between requests; a cookie set by one
+        # check must not change the response another check sees
+        self.session.cookies.set_policy(
+            http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=MAX_WORKERS,
+                              pool_maxsize=MAX_WORKERS)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.well_known_cache = {}
+        self.http_cache_file = http_cache_file
+        self.http_cache = self.load_http_cache()
+        # Sites repeat across sets and fields, so memoize the public suffix
+        # list lookups for the lifetime of this checker
+        self.etld_info = functools.lru_cache(maxsize=8192)(self.etld_info)
+
+    def collect_errors(self, tasks):
+        """Runs network checks concurrently and collects their errors
+
+        Submits each task to a thread pool, since the checks spend almost all
+        of their time waiting on remote servers. Each task is a tuple of a
+        function returning a list of error strings followed by its arguments.
+        Errors are added to the error_list in the order the tasks were given,
+        so that the output does not depend on which request finishes first.
+
+        Args:
+            tasks: list[tuple]
+        Returns:
+            None
+        """
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = [executor.submit(*task) for task in tasks]
+            for future in futures:
+                self.error_list.extend(future.result())
 
     def validate_schema(self, schema_file):
         """Validates the canonical sites list
 
-        Calls the validate function from the jsonschema package on the input 
-        from canonical_sites against our predertermined schema
+        Validates the input from canonical_sites against our predertermined 
+        schema, using the validator cached by load_schema_validator
 
         Args:
             self
@@ -60,9 +157,10 @@ class RwsCheck:
             jsonschema.exceptions.ValidationError if the schema does not match 
             the format stored in SCHEMA 
         """
-        with open(schema_file) as f:
-            SCHEMA = json.loads(f.read())
-        validate(self.rws_sites, schema = SCHEMA)
+        validator = load_schema_validator(schema_file)
+        error = best_match(validator.iter_errors(self.rws_sites))
+        if error is not None:
+            raise error
 
     def load_sets(self):
         """Loads sets from the JSON file into a dictionary of primary->RwsSet
@@ -84,7 +182,7 @@ class RwsCheck:
             ccTLDs = rwset.get('ccTLDs')
             associated_sites = rwset.get('associatedSites')
             service_sites = rwset.get('serviceSites')
-            if primary in check_sets.keys():
+            if primary in check_sets:
                 load_sets_errors.append(
                     f"{primary} is already a primary of another site")
             else:
@@ -114,7 +212,7 @@ class RwsCheck:
             rationales = rwset.get('rationaleBySite', None)
             if sites and rationales!=None:
                 for site in sites:
-                    if site not in rationales.keys():
+                    if site not in rationales:
                         self.error_list.append(
                             f"There is no provided rationale for {site}")
             if sites!=None and rationales == None:
@@ -135,88 +233,41 @@ class RwsCheck:
         Returns:
             None
         """
-        site_list = set()
+        # Every site registered by the sets seen so far
+        registered = set()
         for primary, rws in check_sets.items():
             # Check the primary
-            if primary in site_list:
+            if primary in registered:
                 self.error_list.append(
                     "This primary is already registered in another related website"
                     + f" set: {primary}")
             else:
-                site_list.add(primary)
-            # Check the associated sites
-            associated_overlap = set(rws.associated_sites) & site_list
-            if associated_overlap:
-                self.error_list.append(
-                    "These associated sites are already registered in " + 
-                    f"another related website set: {associated_overlap}")
-            else:
-                site_list.update(rws.associated_sites)
-            # Check the service sites
-            service_overlap = set(rws.service_sites) & site_list
-            if service_overlap:
-                self.error_list.append(
-                    "These service sites are already registered in another"
-                    + f" related website set: {service_overlap}")
-            else:
-                site_list.update(rws.service_sites)
-            # Check the ccTLDs
-            for aliases in rws.ccTLDs.values():
-                alias_overlap = set(aliases) & site_list
-                if alias_overlap:
-                    self.error_list.append(
-                        "These ccTLD sites are already registered in "
-                        + f"another related website set: {alias_overlap}")
+                registered.add(primary)
+            # Check the associated sites, service sites, and ccTLDs
+            fields = [("associated", rws.associated_sites_set),
+                      ("service", rws.service_sites_set)]
+            fields.extend(("ccTLD", aliases) for aliases in rws.ccTLD_sets.values())
+            for kind, sites in fields:
+                # Only build the overlap when there is one to report
+                if registered.isdisjoint(sites):
+                    registered.update(sites)
                 else:
-                    site_list.update(aliases)
-
-    def url_is_https(self, site):
-        """A function that checks for https://
-
-        Reads a domain name and returns whether or not it begins with https://
-        
-        Args:
-            site: string corresponding to a domain name
-        Returns:
-            boolean with truth value if the domain name begins with https://
-        """
-        return site.startswith("https://")
+                    self.error_list.append(
+                        f"These {kind} sites are already registered in "
+                        + f"another related website set: {registered & sites}")
 
     def find_non_https_urls(self, check_sets):
         """Checks for https:// in all sites. 
 
-        Calls url_is_https on all sites in each RwsSet contained in check_sets,
-        and appends errors to the error list for any that return false
+        Checks that all sites in each RwsSet contained in check_sets begin with
+        https://, and appends errors to the error list for any that do not
 
         Args:
             check_sets: Dict[string, RwsSet]
         Returns:
             None
         """
-        for primary, curr_set in check_sets.items():
-            # Apply to the primary
-            if not self.url_is_https(primary):
-                self.error_list.append(
-                    f"The provided primary site does not begin with https:// {primary}")
-            # Apply to the country codes
-            for aliased_site, aliases in curr_set.ccTLDs.items():
-                if not self.url_is_https(aliased_site):
-                    self.error_list.append(
-                        f"The provided aliased site does not begin with https:// {aliased_site}")
-                for alias in aliases:
-                    if not self.url_is_https(alias):
-                        self.error_list.append(
-                            f"The provided alias site does not begin with https:// {alias}")
-            # Apply to associated sites
-            for associated_site in curr_set.associated_sites:
-                if not self.url_is_https(associated_site):
-                    self.error_list.append(
-                        f"The provided associated site does not begin with https:// {associated_site}")
-            # Apply to service sites
-            for service_site in curr_set.service_sites:
-                if not self.url_is_https(service_site):
-                    self.error_list.append(
-                        f"The provided service site does not begin with https:// {service_site}")
+        self.run_local_checks(check_sets, check_etld=False)
 
     def is_eTLD_Plus1(self, site):
         """A helper function for checking if a domain is etld+1 compliant
@@ -230,11 +281,35 @@ class RwsCheck:
         Returns:
             boolean with truth value dependent on value of get_public_suffix
         """
-        assert site is not None
-        site = site.removeprefix("https://")
-        is_etldp1_or_etld = self.etlds.get_sld(site, strict=True) == site
-        is_etld = self.etlds.get_tld(site, strict=True) == site
-        return is_etldp1_or_etld and not is_etld
+        return self.is_eTLD_Plus1_stripped(site.removeprefix(HTTPS))
+
+    def is_eTLD_Plus1_stripped(self, domain):
+        """Checks if a domain without its https:// prefix is etld+1 compliant
+
+        Used by is_eTLD_Plus1 and run_local_checks, which strip the prefix 
+        themselves, and reads the memoized etld_info lookup.
+
+        Args:
+            domain: a string corresponding to a domain name, without https://
+        Returns:
+            boolean, true if the domain is its own eTLD+1 but not an eTLD
+        """
+        sld, tld = self.etld_info(domain)
+        return sld == domain and tld != domain
+
+    def etld_info(self, site):
+        """Looks up the eTLD+1 and eTLD of a domain in the public suffix list
+
+        Results are cached per site by __init__, so each distinct domain only
+        walks the public suffix list once.
+
+        Args:
+            site: a string corresponding to a domain name, without https://
+        Returns:
+            Tuple[string, string] of the eTLD+1 and eTLD of the domain
+        """
+        return (self.etlds.get_sld(site, strict=True),
+                self.etlds.get_tld(site, strict=True))
     
 
     def find_invalid_eTLD_Plus1(self, check_sets):
@@ -248,52 +323,198 @@ class RwsCheck:
         Returns:
             None
         """
-        for primary, curr_set in check_sets.items():
-            # Apply to the primary
-            if not self.is_eTLD_Plus1(primary):
-                self.error_list.append(
-                    f"The provided primary site is not an eTLD+1: {primary}")
-            # Apply to the country codes
-            for aliased_site, aliases in curr_set.ccTLDs.items():
-                if not self.is_eTLD_Plus1(aliased_site):
-                    self.error_list.append(
-                        f"The provided aliased site is not an eTLD+1: {aliased_site}")
-                for alias in aliases:
-                    if not self.is_eTLD_Plus1(alias):
-                        self.error_list.append(
-                            f"The provided alias site is not an eTLD+1: {alias}")
-            # Apply to associated sites
-            for associated_site in curr_set.associated_sites:
-                if not self.is_eTLD_Plus1(associated_site):
-                    self.error_list.append(
-                        f"The provided associated site is not an eTLD+1: {associated_site}")
-            # Apply to service sites
-            for service_site in curr_set.service_sites:
-                if not self.is_eTLD_Plus1(service_site):
-                    self.error_list.append(
-                        f"The provided service site is not an eTLD+1: {service_site}")
+        self.run_local_checks(check_sets, check_https=False)
+
+    def run_local_checks(self, check_sets, check_https=True, check_etld=True):
+        """Runs the per-site checks that do not need network access
+
+        Walks every site in each RwsSet contained in check_sets once, checking
+        that it begins with https:// and that it is an eTLD+1, and appends 
+        errors to the error list for any that fail. Either check can be
+        switched off. The https:// check is inlined, and the eTLD+1 check 
+        strips the prefix itself and calls is_eTLD_Plus1_stripped, to save 
+        method calls per site.
+
+        Args:
+            check_sets: Dict[string, RwsSet]
+            check_https: boolean, whether to check sites begin with https://
+            check_etld: boolean, whether to check sites are eTLD+1s
+        Returns:
+            None
+        """
+        startswith = str.startswith
+        removeprefix = str.removeprefix
+        is_eTLD_Plus1_stripped = self.is_eTLD_Plus1_stripped
+        error_list = self.error_list
+        for curr_set in check_sets.values():
+            for site, kind in curr_set.iter_sites():
+                if check_https and not startswith(site, HTTPS):
+                    error_list.append(
+                        f"The provided {kind} site does not begin with https:// {site}")
+                if (check_etld and 
+                        not is_eTLD_Plus1_stripped(removeprefix(site, HTTPS))):
+                    error_list.append(
+                        f"The provided {kind} site is not an eTLD+1: {site}")
 
     def open_and_load_json(self, url):
-        """Calls urlopen and returns json from a site
+        """Makes a get request and returns json from a site
 
-        Calls urlopena and json.load on a domain. Returns the json object.
+        Calls get on the shared session and parses the response body as json.
+        Returns the json object. The result, or the exception raised while
+        fetching it, is stored in well_known_cache and reused for any later 
+        call with the same url.
         This functionality is separated out here to make testing easier.
         
         Args:
             url: a domain that we want to load the json from
         """
-        req = Request(url=url, headers={'User-Agent': 'Chrome'})
-        with urlopen(req) as json_file:
-            return json.load(json_file)
+        cached = self.well_known_cache.get(url)
+        if cached is None:
+            try:
+                cached = (self.fetch_json(url), None)
+            except Exception as inst:
+                cached = (None, inst)
+            self.well_known_cache[url] = cached
+        json_schema, error = cached
+        if error is not None:
+            raise error
+        return json_schema
+
+    def fetch_json(self, url):
+        """Makes a get request for a url and returns its json
+
+        If the url has an entry in the http_cache, the request is made 
+        conditional on its ETag and Last-Modified headers, and the cached json
+        is returned when the site answers 304 Not Modified. Responses carrying
+        either header are stored in the http_cache, with the time they were
+        fetched, when an http_cache_file is set. A 304 answer renews that time.
+
+        Args:
+            url: the url to request
+        Returns:
+            the json object
+        Raises:
+            requests.HTTPError if the site returns an error status
+        """
+        headers = {'User-Agent': 'Chrome'}
+        entry = self.http_cache.get(url)
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        r = self.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if entry is not None and r.status_code == 304:
+            self.http_cache[url] = dict(entry, fetched=time.time())
+            return entry['json']
+        r.raise_for_status()
+        # Response.json also accepts files with a BOM or in UTF-16/32
+        json_schema = r.json()
+        if self.http_cache_file:
+            etag = r.headers.get('ETag')
+            last_modified = r.headers.get('Last-Modified')
+            if etag or last_modified:
+                self.http_cache[url] = {'etag': etag,
+                                        'last_modified': last_modified,
+                                        'json': json_schema,
+                                        'fetched': time.time()}
+            else:
+                self.http_cache.pop(url, None)
+        return json_schema
+
+    def load_http_cache(self):
+        """Reads the http cache saved by a previous run
+
+        Returns an empty cache if no http_cache_file is set, or if the file is
+        missing or cannot be read. Entries fetched more than 
+        HTTP_CACHE_MAX_AGE seconds ago are dropped.
+
+        Returns:
+            Dict[string, Dict]
+        """
+        if not self.http_cache_file:
+            return {}
+        try:
+            with open(self.http_cache_file) as f:
+                http_cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(http_cache, dict):
+            return {}
+        oldest = time.time() - HTTP_CACHE_MAX_AGE
+        return {url: entry for url, entry in http_cache.items()
+                if isinstance(entry, dict) and 
+                isinstance(entry.get('fetched'), (int, float)) and
+                entry['fetched'] >= oldest}
+
+    def save_http_cache(self):
+        """Writes the http cache to http_cache_file, if one is set
+
+        The cache only saves requests, so failing to write it is not an error.
+
+        Returns:
+            None
+        """
+        if not self.http_cache_file:
+            return
+        try:
+            with open(self.http_cache_file, 'w') as f:
+                json.dump(self.http_cache, f)
+        except OSError:
+            pass
+
+    def get_status(self, url, allow_redirects=True):
+        """Requests only the status and headers of a url
+
+        Makes a streamed get request on the shared session and closes it
+        before the body is read, so the body is never downloaded. A get is
+        used rather than a head request, since some servers answer head 
+        requests with a different status or headers than get requests.
+
+        Args:
+            url: the url to request
+            allow_redirects: boolean, whether to follow redirects
+        Returns:
+            requests.Response
+        """
+        r = self.session.get(url, timeout=REQUEST_TIMEOUT, stream=True,
+                             allow_redirects=allow_redirects)
+        r.close()
+        return r
+
+    def check_list_site(self, primary, site):
+        """Checks that a site has the correct primary on its well-known page
+
+        Reads the json on the well-known page of site, and returns an error if
+        it does not contain the passed in primary as its listed primary. Also
+        catches and returns any exceptions when trying to open or read the url
+
+        Args:
+            primary: the domain name of the primary site
+            site: the domain name to access
+        Returns:
+            list[string]
+        """
+        url = site + WELL_KNOWN
+        try:
+            json_schema = self.open_and_load_json(url)
+            if 'primary' not in json_schema:
+                return ["The listed associated site site did not have primary"
+                        + f" as a key in its {WELL_KNOWN} file: {site}"]
+            elif json_schema['primary'] != primary:
+                return ["The listed associated site "
+                + f"did not have {primary} listed as its primary: {site}"]
+        except Exception as inst:
+            return [f"Experienced an error when trying to access {url}; "
+                    + f"error was: {inst}"]
+        return []
 
     def check_list_sites(self, primary, site_list):
         """Checks that sites in a given list have the correct primary on their 
         well-known page
         
-        Calls urlopen on a given list of sites, reads their json, and adds any
-        sites that do not contain the passed in primary as their listed primary
-        to the error list. Also catches and adds any exceptions when trying to
-        open or read the url
+        Calls check_list_site concurrently on a given list of sites, and adds
+        any errors it returns to the error list.
         
         Args:
             primary: the domain name of the primary site
@@ -301,108 +522,160 @@ class RwsCheck:
         Returns:
             None
         """
-        for site in site_list:
-            url = site + WELL_KNOWN
-            try:
-                json_schema = self.open_and_load_json(url)
-                if 'primary' not in json_schema.keys():
-                    self.error_list.append(
-                        "The listed associated site site did not have primary"
-                        + f" as a key in its {WELL_KNOWN} file: {site}")
-                elif json_schema['primary'] != primary:
-                    self.error_list.append("The listed associated site "
-                    + f"did not have {primary} listed as its primary: {site}")
-            except Exception as inst:
-                self.error_list.append(
-                    f"Experienced an error when trying to access {url}; "
-                    + f"error was: {inst}")
+        self.collect_errors(
+            [(self.check_list_site, primary, site) for site in site_list])
     
-    def check_well_known_list(self, field, list1, list2):
+    def check_well_known_list(self, field, list1, list2, set1=None, set2=None):
         """Checks that 2 lists for a given field match each other
         
-        Applies a symmetric diff to list1 and list2 and returns an empty list
-        if the 2 fields are symmetric. Otherwise returns a list with a single
+        Compares the sites in list1 and list2 and returns an empty list if 
+        they contain the same sites. Otherwise returns a list with a single
         string to be used as error text, containing the field, list1, list2, 
-        and their symmetric diff.
+        and their symmetric diff. If frozensets of the lists are already 
+        available they can be passed as set1 and set2 to avoid rebuilding them.
 
         Args:
             field: string
             list1: list[string]
             list2: list[string]
+            set1: frozenset[string] of list1, optional
+            set2: frozenset[string] of list2, optional
         Returns:
             list[string]
         """
-        if list1 == list2:
+        if set1 is None:
+            set1 = frozenset(list1)
+        if set2 is None:
+            set2 = frozenset(list2)
+        if set1 == set2:
             return []
-        diff = sorted(set(list1) ^ set(list2))
+        diff = sorted(set1.symmetric_difference(set2))
         return [f"Encountered an inequality between the PR submission and the {WELL_KNOWN} file:\n" +
                 f"\t{field} was {list1} in the PR, and {list2} in the well-known.\n" +
                 f"\tDiff was: {diff}."]
 
+    def check_primary_well_known(self, primary, curr_rws_set):
+        """Checks the well-known page of a primary against its RWS set
+
+        Reads the json on the well-known page of the primary, validates it
+        against well_known_schema_file, and compares its primary, associatedSites, 
+        serviceSites, and ccTLDs against those of curr_rws_set. Returns errors
+        for any schema violation or mismatch, or for any exception when trying
+        to open or read the url.
+
+        Args:
+            primary: the domain name of the primary site
+            curr_rws_set: RwsSet
+        Returns:
+            list[string]
+        """
+        errors = []
+        url = primary + WELL_KNOWN
+        # Read the well-known files and check them against the schema we 
+        # have stored
+        try:
+            json_schema = self.open_and_load_json(url)
+            schema_errors = [
+                f"The {WELL_KNOWN} file for {primary} does not match the "
+                + f"well-known schema: {error.message}"
+                for error in load_schema_validator(
+                    self.well_known_schema_file).iter_errors(json_schema)]
+            if schema_errors:
+                return schema_errors
+            well_known_set = RwsSet(
+                json_schema.get('ccTLDs'), 
+                json_schema.get('primary'), 
+                json_schema.get('associatedSites'), 
+                json_schema.get('serviceSites'))
+            if well_known_set.primary != curr_rws_set.primary:
+                errors.append(f"The {WELL_KNOWN} set's primary ({well_known_set.primary}) did not equal " +
+                f"the PR set's primary ({curr_rws_set.primary})")
+            errors.extend(self.check_well_known_list(
+                "associatedSites",
+                curr_rws_set.associated_sites, 
+                well_known_set.associated_sites,
+                curr_rws_set.associated_sites_set,
+                well_known_set.associated_sites_set
+                )
+            )
+            errors.extend(self.check_well_known_list(
+                "serviceSites",
+                curr_rws_set.service_sites, 
+                well_known_set.service_sites,
+                curr_rws_set.service_sites_set,
+                well_known_set.service_sites_set
+                )
+            )
+            # Walk the aliased sites of both sets, in order, without building
+            # a merged dict of the two
+            aliased_sites = itertools.chain(
+                curr_rws_set.ccTLDs,
+                (aliased_site for aliased_site in well_known_set.ccTLDs
+                 if aliased_site not in curr_rws_set.ccTLDs))
+            for aliased_site in aliased_sites:
+                errors.extend(self.check_well_known_list(
+                    aliased_site + " alias list",
+                    curr_rws_set.ccTLDs.get(aliased_site, []),
+                    well_known_set.ccTLDs.get(aliased_site, []),
+                    curr_rws_set.ccTLD_sets.get(aliased_site, frozenset()),
+                    well_known_set.ccTLD_sets.get(aliased_site, frozenset())
+                    )
+                )
+        except Exception as inst:
+            errors.append(
+                f"Experienced an error when trying to access {url}; error was: {inst}")
+        return errors
+
     def find_invalid_well_known(self, check_sets):
         """Checks for and validates well-known pages for RWS sets
 
         Checks for a ./well-known page for related website sets under each
         domain, and checks that the format of the file aligns with the provided
         pages in the canonical list.
-        Calls check_list_sites on all ccTLDs, associated, and service sites.
+        Calls check_list_site on all ccTLDs, associated, and service sites.
         Appends to the error_list whenever a site is unreachable, an incorrect
         format, or its contents do no match what is expected.
+        All pages are requested concurrently.
 
         Args:
             check_sets: Dict[string, RwsSet]
         Returns:
             None
         """
-        # Check the schema to ensure consistency
+        tasks = []
         for primary, curr_rws_set in check_sets.items():
             # First we check the primary sites
-            url = primary + WELL_KNOWN
-            # Read the well-known files and check them against the schema we 
-            # have stored
-            try:
-                json_schema = self.open_and_load_json(url)
-                well_known_set = RwsSet(
-                    json_schema.get('ccTLDs'), 
-                    json_schema.get('primary'), 
-                    json_schema.get('associatedSites'), 
-                    json_schema.get('serviceSites'))
-                if well_known_set.primary != curr_rws_set.primary:
-                    self.error_list.append(f"The {WELL_KNOWN} set's primary ({well_known_set.primary}) did not equal " +
-                    f"the PR set's primary ({curr_rws_set.primary})")
-                self.error_list.extend(self.check_well_known_list(
-                    "associatedSites",
-                    curr_rws_set.associated_sites, 
-                    well_known_set.associated_sites
-                    )
-                )
-                self.error_list.extend(self.check_well_known_list(
-                    "serviceSites",
-                    curr_rws_set.service_sites, 
-                    well_known_set.service_sites
-                    )
-                )
-                for aliased_site in curr_rws_set.ccTLDs | well_known_set.ccTLDs:
-                    self.error_list.extend(self.check_well_known_list(
-                        aliased_site + " alias list",
-                        curr_rws_set.ccTLDs.get(aliased_site, []),
-                        well_known_set.ccTLDs.get(aliased_site, [])
-                        )
-                    )
-            except Exception as inst:
-                self.error_list.append(
-                    f"Experienced an error when trying to access {url}; error was: {inst}")
+            tasks.append(
+                (self.check_primary_well_known, primary, curr_rws_set))
             # Check the member sites.
-            self.check_list_sites(
-                primary,
-                curr_rws_set.associated_sites +
-                    curr_rws_set.service_sites +
-                    [alias
-                     for aliases in curr_rws_set.ccTLDs.values()
-                     for alias in aliases
-                    ]
-            )
+            member_sites = (curr_rws_set.associated_sites +
+                            curr_rws_set.service_sites +
+                            [alias
+                             for aliases in curr_rws_set.ccTLDs.values()
+                             for alias in aliases
+                            ])
+            tasks.extend(
+                (self.check_list_site, primary, site) for site in member_sites)
+        self.collect_errors(tasks)
         
+    def check_removal(self, primary):
+        """Checks that the well-known page of a removed primary returns 404
+
+        Args:
+            primary: the domain name of the removed primary site
+        Returns:
+            list[string]
+        """
+        url = primary + WELL_KNOWN
+        try:
+            r = self.get_status(url)
+            if r.status_code != 404:
+                return [f"The set associated with {primary}"
+                        + f" was removed from the list, but {url} does not return error 404."]
+        except Exception as inst:
+            return [f"Unexpected error when accessing {url}; Received error: {inst}"]
+        return []
+
     def find_invalid_removal(self, subtracted_sets):
         """Checks that any sets being removed were properly removed by owner
         
@@ -412,15 +685,8 @@ class RwsCheck:
             subtracted_sets: Dict[string, RwsSet]
         Returns:
             None"""
-        for primary in subtracted_sets:
-            url = primary + WELL_KNOWN
-            try:
-                r = requests.get(url, timeout=10)
-                if r.status_code != 404:
-                    self.error_list.append(f"The set associated with {primary}"
-                            + f" was removed from the list, but {url} does not return error 404.")
-            except Exception as inst:
-                self.error_list.append(f"Unexpected error when accessing {url}; Received error: {inst}")
+        self.collect_errors(
+            [(self.check_removal, primary) for primary in subtracted_sets])
 
     def find_invalid_alias_eSLDs(self, check_sets):
         """Checks that eSLDs match their alias, and that country codes are 
@@ -445,15 +711,15 @@ class RwsCheck:
                         "primary, associated site, or service site " +
                         f"within the firsty pary set for {primary}")
                 # check the validity of the aliases
-                aliased_eSLD, aliased_tld = (aliased_site.split(".")[0],
-                                                aliased_site.split(".")[-1])
+                aliased_parts = aliased_site.split(".")
+                aliased_eSLD, aliased_tld = aliased_parts[0], aliased_parts[-1]
                 if aliased_tld in self.icanns:
-                    icann_check = self.icanns.union({"com"})
+                    icann_check = self.icanns_with_com
                 else:
                     icann_check = self.icanns
-                variants = [(site, site.split(".")[0], site.split(".")[-1])
-                            for site in aliases]
-                for site, eSLD, tld in variants:
+                for site in aliases:
+                    parts = site.split(".")
+                    eSLD, tld = parts[0], parts[-1]
                     if eSLD != aliased_eSLD:
                         self.error_list.append(
                             f"The following top level domain must match: {aliased_site}, but is instead: {site}")
@@ -461,6 +727,30 @@ class RwsCheck:
                         self.error_list.append(
                             f"The provided country code: {tld}, in: {site} is not a ICANN registered country code")
 
+    def check_robots_tag(self, service_site):
+        """Checks that a service site has a valid X-Robots-Tag in its header
+
+        Args:
+            service_site: the domain name of the service site
+        Returns:
+            list[string]
+        """
+        try:
+            r_service = self.get_status(service_site, allow_redirects=False)
+            if 'X-Robots-Tag' not in r_service.headers:
+                return [f"The service site {service_site} does not have an X-Robots-Tag in its "
+                 + "header"]
+            robots_tag = r_service.headers['X-Robots-Tag']
+            if ':' in robots_tag:
+                return [f"The service site {service_site} contains an 'X-Robots-Tag' " +
+                    "that does not meet the policy requirements"]
+            elif 'none' not in robots_tag and 'noindex' not in robots_tag:
+                return [f"The service site {service_site} does not have a " +
+                    "'noindex' or 'none' tag in its header"]
+        except Exception as inst:
+            return [f"Unexpected error for service site: {service_site}; Received error: {inst}"]
+        return []
+
     def find_robots_tag(self, check_sets):
         """Checks service sites to see if they have a robots.txt subdomain.
 
@@ -474,25 +764,31 @@ class RwsCheck:
         Returns:
             None
         """
-        for curr_set in check_sets.values():
-            for service_site in curr_set.service_sites:
-                try:
-                    r_service = requests.get(service_site, timeout=10, allow_redirects=False)
-                    if 'X-Robots-Tag' not in r_service.headers:
-                        self.error_list.append(f"The service site {service_site} does not have an X-Robots-Tag in its "
-                         + "header")
-                    else:
-                        robots_tag = r_service.headers['X-Robots-Tag']
-                        if ':' in robots_tag:
-                            self.error_list.append(f"The service site {service_site} contains an 'X-Robots-Tag' " +
-                                "that does not meet the policy requirements")
-                        elif 'none' not in robots_tag and 'noindex' not in robots_tag:
-                                    self.error_list.append(f"The service site {service_site} does not have a " +
-                                        "'noindex' or 'none' tag in its header"
-                                        )
-                except Exception as inst:
-                    self.error_list.append(
-                        f"Unexpected error for service site: {service_site}; Received error: {inst}")
+        self.collect_errors([(self.check_robots_tag, service_site)
+                             for curr_set in check_sets.values()
+                             for service_site in curr_set.service_sites])
+
+    def check_ads_txt(self, service_site):
+        """Checks that a service site does not serve an ads.txt file
+
+        Args:
+            service_site: the domain name of the service site
+        Returns:
+            list[string]
+        """
+        ads_site = service_site + ADS_TXT
+        try:
+            r = self.get_status(ads_site)
+            if r.status_code == 200:
+                return [f"The service site {service_site} has an ads.txt file, this violates "
+                + "the policies for service sites"]
+        except Exception as inst:
+            error_text = str(inst)
+            if (EXCEPTION_RETRIES_ADS_TXT not in error_text and
+                    EXCEPTION_TIMEOUT not in error_text):
+                return [f"Unexpected error for service site: {service_site}\n" + 
+                    f"Received error: {error_text}"]
+        return []
 
     def find_ads_txt(self, check_sets):
         """Checks to see if service sites have an ads.txt subdomain. 
@@ -507,23 +803,36 @@ class RwsCheck:
         Returns:
             None
         """
+        self.collect_errors([(self.check_ads_txt, service_site)
+                             for curr_set in check_sets.values()
+                             for service_site in curr_set.service_sites])
 
-        exception_retries = "Max retries exceeded with url: /ads.txt"
-        exception_timeout = "Read timed out. (read timeout=10)"
-        for curr_set in check_sets.values():
-            for service_site in curr_set.service_sites:
-                ads_site = service_site + "/ads.txt"
-                try:
-                    r = requests.get(ads_site, timeout=10)
-                    if r.status_code == 200:
-                        self.error_list.append(f"The service site {service_site} has an ads.txt file, this violates "
-                        + "the policies for service sites")
-                except Exception as inst:
-                    if exception_retries not in str(inst):
-                        if exception_timeout not in str(inst):
-                            self.error_list.append(
-                                f"Unexpected error for service site: {service_site}\n" + 
-                                f"Received error: {inst}")
+    def check_service_redirect(self, service_site):
+        """Checks that a service site redirects or returns a 4xx or 5xx error
+
+        Args:
+            service_site: the domain name of the service site
+        Returns:
+            list[string]
+        """
+        try:
+            r = self.get_status(service_site)
+            # We want the request status_code to be a 4xx or 5xx, raise
+            # an exception if it's outside that range
+            if r.status_code < 400 or r.status_code >= 600:
+                # If a get request to a service site successfully 
+                # connects to that site, we expect it to be a redirect
+                # If it is not a redirect, we raise an exception
+                if r.url == service_site or r.url == service_site+"/":
+                    return [f"The service site must not be an endpoint: {service_site}"]
+        except Exception as inst:
+            error_text = str(inst)
+            if (EXCEPTION_RETRIES not in error_text and
+                    EXCEPTION_TIMEOUT not in error_text):
+                return [f"Unexpected error for "
+                + f"service site: {service_site}\n"
+                + f"Received error: {error_text}"]
+        return []
 
     def check_for_service_redirect(self, check_sets):
         """Checks to see if service sites redirect to another site
@@ -539,25 +848,6 @@ class RwsCheck:
         Returns:
             None
         """
-
-        exception_retries = "Max retries exceeded with url: /"
-        exception_timeout = "Read timed out. (read timeout=10)"
-        for curr_set in check_sets.values():
-            for service_site in curr_set.service_sites:
-                try:
-                    r = requests.get(service_site, timeout=10)
-                    # We want the request status_code to be a 4xx or 5xx, raise
-                    # an exception if it's outside that range
-                    if r.status_code < 400 or r.status_code >= 600:
-                        # If a get request to a service site successfully 
-                        # connects to that site, we expect it to be a redirect
-                        # If it is not a redirect, we raise an exception
-                        if r.url == service_site or r.url == service_site+"/":
-                            self.error_list.append(
-                                f"The service site must not be an endpoint: {service_site}")
-                except Exception as inst:
-                    if exception_retries not in str(inst):
-                        if exception_timeout not in str(inst):
-                            self.error_list.append(f"Unexpected error for "
-                            + f"service site: {service_site}\n"
-                            + f"Received error: {inst}")
+        self.collect_errors([(self.check_service_redirect, service_site)
+                             for curr_set in check_sets.values()
+                             for service_site in curr_set.service_sites])
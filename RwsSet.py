@@ -24,6 +24,10 @@ class RwsSet:
     members of the related website set. 
     relevant_fields_dict: a dictionary mapping the JSON field equivalents
     of each field to their value within the object. 
+    associated_sites_set: a frozenset of associated_sites
+    service_sites_set: a frozenset of service_sites
+    ccTLD_sets: a dictionary mapping each aliased site in ccTLDs to a 
+    frozenset of its aliases
   """
     def __init__(self, ccTLDs, primary, associated_sites=[], service_sites=[]):
         self.ccTLDs = {} if ccTLDs is None else ccTLDs
@@ -34,6 +38,10 @@ class RwsSet:
                                      'primary': self.primary,
                                      'associatedSites': self.associated_sites, 
                                      'serviceSites': self.service_sites}
+        self.associated_sites_set = frozenset(self.associated_sites)
+        self.service_sites_set = frozenset(self.service_sites)
+        self.ccTLD_sets = {aliased_site: frozenset(aliases)
+                           for aliased_site, aliases in self.ccTLDs.items()}
     
     def __eq__(self, obj):
       if isinstance(obj, RwsSet) and self.primary == obj.primary:
@@ -45,9 +53,22 @@ class RwsSet:
     
     def includes(self, domain, with_ccTLDs=True):
        if (self.primary == domain or
-                   domain in (self.associated_sites or []) or
-                   domain in (self.service_sites or [])):
+                   domain in self.associated_sites_set or
+                   domain in self.service_sites_set):
            return True
        if with_ccTLDs:
-           return domain in (variant for variant_list in self.ccTLDs.values() for variant in variant_list)
-       return False
\ No newline at end of file
+           return any(domain in variants for variants in self.ccTLD_sets.values())
+       return False
+
+    def iter_sites(self):
+      """Yields (site, kind) for every site listed in the set, where kind is
+      one of primary, aliased, alias, associated, or service"""
+      yield self.primary, "primary"
+      for aliased_site, aliases in self.ccTLDs.items():
+        yield aliased_site, "aliased"
+        for alias in aliases:
+          yield alias, "alias"
+      for associated_site in self.associated_sites:
+        yield associated_site, "associated"
+      for service_site in self.service_sites:
+        yield service_site, "service"
@@ -50,8 +50,9 @@ def main():
     cli_primaries = []
     input_prefix = ''
     with_diff = False
+    http_cache_file = None
     opts, _ = getopt.getopt(args, "i:p:", ["data_directory=", "with_diff", 
-                                         "primaries="])
+                                         "primaries=", "http_cache="])
     for opt, arg in opts:
         if opt == '-i':
             input_file = arg
@@ -61,6 +62,8 @@ def main():
             with_diff = True
         if opt == '--primaries' or opt == '-p':
             cli_primaries.extend(arg.split(','))
+        if opt == '--http_cache':
+            http_cache_file = arg
 
     # Open and load the json of the new list
     with open(input_file) as f:
@@ -82,7 +85,8 @@ def main():
             l = line.strip()
             icanns.add(l)
 
-    rws_checker = RwsCheck(rws_sites, etlds, icanns)
+    rws_checker = RwsCheck(rws_sites, etlds, icanns, http_cache_file,
+        os.path.join(input_prefix,'WELL_KNOWN_SCHEMA.json'))
     error_texts = []
 
     try:
@@ -92,9 +96,12 @@ def main():
         print(inst)
         return
     
-    # Check for exclusivity among all sets in the updated version
+    # Load the sets of the updated version once, and check for exclusivity
+    # among all of them
+    all_sets = {}
     try:
-        rws_checker.check_exclusivity(rws_checker.load_sets())
+        all_sets = rws_checker.load_sets()
+        rws_checker.check_exclusivity(all_sets)
     except Exception as inst:
             error_texts.append(inst)
 
@@ -114,9 +121,11 @@ def main():
                     "\nerror was: " + inst)
                 return
         old_checker = RwsCheck(old_sites, etlds, icanns)
-        check_sets, subtracted_sets = find_diff_sets(old_checker.load_sets(), rws_checker.load_sets())
+        # Only sets that were added or modified are checked further, so
+        # unchanged sets do not repeat their network checks
+        check_sets, subtracted_sets = find_diff_sets(old_checker.load_sets(), all_sets)
     else:
-        check_sets = rws_checker.load_sets()
+        check_sets = all_sets
         if cli_primaries:
             absent_primaries = [p for p in cli_primaries if p not in check_sets]
             for p in absent_primaries:
@@ -130,8 +139,7 @@ def main():
     # Run rest of checks
     check_list = [
         rws_checker.has_all_rationales,
-        rws_checker.find_non_https_urls, 
-        rws_checker.find_invalid_eTLD_Plus1,
+        rws_checker.run_local_checks,
         rws_checker.find_invalid_well_known, 
         rws_checker.find_invalid_alias_eSLDs, 
         rws_checker.find_robots_tag, 
@@ -144,6 +152,7 @@ def main():
             check(check_sets)
         except Exception as inst:
             error_texts.append(inst)
+    rws_checker.save_http_cache()
     # This message allows us to check the succes of our action
     if rws_checker.error_list or error_texts:
         for checker_error in rws_checker.error_list:
@@ -1,14 +1,23 @@
 import unittest
 import sys
+import os
+import tempfile
+import time
+import json
+import http.client
+import codecs
+import requests
 from jsonschema import ValidationError
 from publicsuffix2 import PublicSuffixList
 from unittest import mock
 from requests import structures
+from requests.cookies import extract_cookies_to_jar
 
 sys.path.append('.')
 from RwsSet import RwsSet
 from RwsCheck import RwsCheck
 from RwsCheck import WELL_KNOWN
+from RwsCheck import load_schema_validator
 from check_sites import find_diff_sets
 
 class TestValidateSchema(unittest.TestCase):
@@ -98,6 +107,16 @@ class TestValidateSchema(unittest.TestCase):
        with self.assertRaises(ValidationError):
             rws_check.validate_schema("SCHEMA.json")
 
+    def test_schema_validator_cached(self):
+        json_dict = {"sets": []}
+        rws_check = RwsCheck(rws_sites=json_dict,
+                      etlds=None, icanns=set())
+        load_schema_validator.cache_clear()
+        rws_check.validate_schema("SCHEMA.json")
+        rws_check.validate_schema("SCHEMA.json")
+        self.assertEqual(load_schema_validator.cache_info().misses, 1)
+        self.assertEqual(load_schema_validator.cache_info().hits, 1)
+
 class TestRwsSetEqual(unittest.TestCase):
     def test_equal_case(self):
         rws_1 = RwsSet(ccTLDs={
@@ -385,6 +404,31 @@ class TestCheckExclusivity(unittest.TestCase):
         rws_check.check_exclusivity(loaded_sets)
         self.assertEqual(rws_check.error_list, [])
     
+    def test_cctld_overlap(self):
+        json_dict = {
+            "sets":
+            [
+                {
+                    "primary": "https://primary.com",
+                    "ccTLDs": {
+                        "https://primary.com": ["https://primary.ca"]
+                    }
+                },
+                {
+                    "primary": "https://primary2.com",
+                    "associatedSites": ["https://primary.ca"]
+                }
+            ]
+        }
+        rws_check = RwsCheck(rws_sites=json_dict,
+                      etlds=None,
+                       icanns=set())
+        loaded_sets = rws_check.load_sets()
+        rws_check.check_exclusivity(loaded_sets)
+        self.assertEqual(rws_check.error_list, 
+         ["These associated sites are already registered in another" 
+                        + " related website set: {'https://primary.ca'}"])
+
 class TestFindNonHttps(unittest.TestCase):
     def test_no_https_in_primary(self):
         json_dict = {
@@ -614,6 +658,38 @@ class TestFindInvalidETLD(unittest.TestCase):
         self.assertEqual(rws_check.error_list, 
                 ["The provided primary site is not an eTLD+1: https://7.bg"])
         
+    def test_repeated_site_lookup_cached(self):
+        rws_check = RwsCheck(rws_sites={},
+                    etlds=PublicSuffixList(
+                        psl_file = 'effective_tld_names.dat'),
+                    icanns=set())
+        self.assertTrue(rws_check.is_eTLD_Plus1("https://primary.com"))
+        self.assertTrue(rws_check.is_eTLD_Plus1("primary.com"))
+        self.assertEqual(rws_check.etld_info.cache_info().misses, 1)
+        self.assertEqual(rws_check.etld_info.cache_info().hits, 1)
+
+    def test_local_checks_combined(self):
+        json_dict = {
+            "sets":
+            [
+                {
+                    "primary": "primary.com",
+                    "associatedSites": ["https://associated.c2om"]
+                }
+            ]
+        }
+        rws_check = RwsCheck(rws_sites=json_dict,
+                    etlds=PublicSuffixList(
+                        psl_file = 'effective_tld_names.dat'),
+                    icanns=set())
+        loaded_sets = rws_check.load_sets()
+        rws_check.run_local_checks(loaded_sets)
+        self.assertEqual(rws_check.error_list, 
+                ["The provided primary site does not begin with https:// " +
+                 "primary.com",
+                 "The provided associated site is not an eTLD+1: " +
+                 "https://associated.c2om"])
+
 class TestFindInvalidESLDs(unittest.TestCase):
     def test_invalid_alias_name(self):
         json_dict = {
@@ -936,6 +1012,9 @@ def mock_get(*args, **kwargs):
             self.status_code = status_code
             self.url = args[0]
 
+        def close(self):
+            pass
+
     if args[0] == 'https://service1.com':
         return MockedGetResponse({}, 200)
     elif args[0] == 'https://service2.com':
@@ -1010,14 +1089,19 @@ def mock_open_and_load_json(*args, **kwargs):
             "primary": "https://primary5.com",
             "unchecked": "An unchecked field"
         }
+    elif args[0] == 'https://primary6.com' + WELL_KNOWN:
+        return {
+            "primary": "https://primary6.com",
+            "associatedSites": "https://associated6.com"
+        }
     return {"primary":None}
 
 # Our test case class
 class MockTestsClass(unittest.TestCase):
 
-    # We patch requests.get with our mocked method. We'll pass
+    # We patch requests.Session.get with our mocked method. We'll pass
     # in the relevant urls, and get our responses for robots checks
-    @mock.patch('requests.get', side_effect=mock_get)
+    @mock.patch('requests.Session.get', side_effect=mock_get)
     def test_robots(self, mock_get):
         # Assert requests.get calls
         json_dict = {
@@ -1038,7 +1122,7 @@ class MockTestsClass(unittest.TestCase):
         "https://service1.com " +
         "does not have an X-Robots-Tag in its header"])
         
-    @mock.patch('requests.get', side_effect=mock_get)
+    @mock.patch('requests.Session.get', side_effect=mock_get)
     def test_robots_wrong_tag(self, mock_get):
         # Assert requests.get calls
         json_dict = {
@@ -1059,7 +1143,7 @@ class MockTestsClass(unittest.TestCase):
         "https://service2.com " +
         "does not have a 'noindex' or 'none' tag in its header"])
 
-    @mock.patch('requests.get', side_effect=mock_get)
+    @mock.patch('requests.Session.get', side_effect=mock_get)
     def test_robots_expected_tag(self, mock_get):
         # Assert requests.get calls
         json_dict = {
@@ -1078,7 +1162,7 @@ class MockTestsClass(unittest.TestCase):
         rws_check.find_robots_tag(loaded_sets)
         self.assertEqual(rws_check.error_list, [])
 
-    @mock.patch('requests.get', side_effect=mock_get)
+    @mock.patch('requests.Session.get', side_effect=mock_get)
     def test_robots_none_tag(self, mock_get):
         # Assert requests.get calls
         json_dict = {
@@ -1097,7 +1181,7 @@ class MockTestsClass(unittest.TestCase):
         rws_check.find_robots_tag(loaded_sets)
         self.assertEqual(rws_check.error_list, [])
 
-    @mock.patch('requests.get', side_effect=mock_get)
+    @mock.patch('requests.Session.get', side_effect=mock_get)
     def test_robots_redirects(self, mock_get):
         json_dict = {
             "sets":
@@ -1116,7 +1200,7 @@ class MockTestsClass(unittest.TestCase):
         self.assertEqual(rws_check.error_list, [])
 
     # We run a similar set of mock tests for ads.txt
-    @mock.patch('requests.get', side_effect=mock_get)
+    @mock.patch('requests.Session.get', side_effect=mock_get)
     def test_ads(self, mock_get):
         # Assert requests.get calls
         json_dict = {
@@ -1137,7 +1221,7 @@ class MockTestsClass(unittest.TestCase):
         "https://service1.com has an ads.txt file, this " +
         "violates the policies for service sites"])
 
-    @mock.patch('requests.get', side_effect=mock_get)
+    @mock.patch('requests.Session.get', side_effect=mock_get)
     def test_ads(self, mock_get):
         # Assert requests.get calls
         json_dict = {
@@ -1156,8 +1240,31 @@ class MockTestsClass(unittest.TestCase):
         rws_check.find_ads_txt(loaded_sets)
         self.assertEqual(rws_check.error_list, [])
 
+    @mock.patch('requests.Session.get', side_effect=mock_get)
+    def test_ads_body_not_read(self, mock_get):
+        json_dict = {
+            "sets":
+            [
+                {
+                    "primary": "https://primary.com",
+                    "serviceSites": ["https://service8.com"]
+                }
+            ]
+        }
+        rws_check = RwsCheck(rws_sites=json_dict,
+                     etlds=None,
+                     icanns=set())
+        loaded_sets = rws_check.load_sets()
+        rws_check.find_ads_txt(loaded_sets)
+        self.assertEqual(rws_check.error_list, ["The service site " +
+        "https://service8.com has an ads.txt file, this " +
+        "violates the policies for service sites"])
+        mock_get.assert_called_once_with('https://service8.com/ads.txt',
+                                         timeout=10, stream=True,
+                                         allow_redirects=True)
+
     # We run a similar set of mock tests for redirect check
-    @mock.patch('requests.get', side_effect=mock_get)
+    @mock.patch('requests.Session.get', side_effect=mock_get)
     def test_non_redirect(self, mock_get):
         # Assert requests.get calls
         json_dict = {
@@ -1177,7 +1284,7 @@ class MockTestsClass(unittest.TestCase):
         self.assertEqual(rws_check.error_list, ["The service site " +
         "must not be an endpoint: https://service1.com"])
 
-    @mock.patch('requests.get', side_effect=mock_get)
+    @mock.patch('requests.Session.get', side_effect=mock_get)
     def test_proper_redirect(self, mock_get):
         # Assert requests.get calls
         json_dict = {
@@ -1196,7 +1303,7 @@ class MockTestsClass(unittest.TestCase):
         rws_check.check_for_service_redirect(loaded_sets)
         self.assertEqual(rws_check.error_list, [])
 
-    @mock.patch('requests.get', side_effect=mock_get)
+    @mock.patch('requests.Session.get', side_effect=mock_get)
     def test_404_redirect(self, mock_get):
         # Assert requests.get calls
         json_dict = {
@@ -1216,7 +1323,7 @@ class MockTestsClass(unittest.TestCase):
         self.assertEqual(rws_check.error_list, [])
 
     # Now we test check_invalid_removal by checking for an error 404
-    @mock.patch('requests.get', side_effect=mock_get)
+    @mock.patch('requests.Session.get', side_effect=mock_get)
     def test_find_invalid_removal(self, mock_get):
         subtracted_sets = {
             'https://primary1.com': 
@@ -1234,7 +1341,7 @@ class MockTestsClass(unittest.TestCase):
                 "https://primary1.com/.well-known/related-website-set.json does " +
                 "not return error 404."])
         
-    @mock.patch('requests.get', side_effect=mock_get)
+    @mock.patch('requests.Session.get', side_effect=mock_get)
     def test_find_valid_removal(self, mock_get):
         subtracted_sets = {
             'https://primary2.com': 
@@ -1454,5 +1561,155 @@ class MockTestsClass(unittest.TestCase):
             "listed as its primary: https://associated3.ca"
         ])
 
+    @mock.patch('RwsCheck.RwsCheck.open_and_load_json', 
+    side_effect=mock_open_and_load_json)
+    def test_list_sites_error_order(self, mock_open_and_load_json):
+        rws_check = RwsCheck(rws_sites={},
+                     etlds=None,
+                     icanns=set())
+        rws_check.check_list_sites("https://primary1.com",
+                                   ["https://associated2.com",
+                                    "https://expected-associated.com",
+                                    "https://associated1.com"])
+        self.assertEqual(rws_check.error_list, [
+            "The listed associated site did not have https://primary1.com " +
+            "listed as its primary: https://associated2.com",
+            "The listed associated site did not have https://primary1.com " +
+            "listed as its primary: https://associated1.com"
+        ])
+
+    @mock.patch('RwsCheck.RwsCheck.open_and_load_json', 
+    side_effect=mock_open_and_load_json)
+    def test_well_known_schema_mismatch(self, mock_open_and_load_json):
+        rws_check = RwsCheck(rws_sites={},
+                     etlds=None,
+                     icanns=set())
+        errors = rws_check.check_primary_well_known(
+            "https://primary6.com",
+            RwsSet(primary="https://primary6.com", ccTLDs={},
+                   associated_sites=["https://associated6.com"]))
+        self.assertEqual(errors, ["The /.well-known/related-website-set.json"
+            + " file for https://primary6.com does not match the well-known "
+            + "schema: 'https://associated6.com' is not of type 'array'"])
+
+    def test_well_known_list_order_ignored(self):
+        rws_check = RwsCheck(rws_sites={},
+                     etlds=None,
+                     icanns=set())
+        self.assertEqual(rws_check.check_well_known_list(
+            "associatedSites",
+            ["https://associated1.com", "https://associated2.com"],
+            ["https://associated2.com", "https://associated1.com"]), [])
+
+    def test_open_and_load_json_cached(self):
+        rws_check = RwsCheck(rws_sites={},
+                     etlds=None,
+                     icanns=set())
+        url = 'https://primary1.com' + WELL_KNOWN
+        with mock.patch.object(rws_check.session, 'get') as mock_session_get:
+            mock_session_get.return_value.json.return_value = {
+                "primary": "https://primary1.com"}
+            for _ in range(2):
+                self.assertEqual(rws_check.open_and_load_json(url),
+                                 {"primary": "https://primary1.com"})
+        mock_session_get.assert_called_once()
+
+    def test_open_and_load_json_error_cached(self):
+        rws_check = RwsCheck(rws_sites={},
+                     etlds=None,
+                     icanns=set())
+        url = 'https://primary1.com' + WELL_KNOWN
+        with mock.patch.object(rws_check.session, 'get',
+                               side_effect=ValueError("unreachable")
+                               ) as mock_session_get:
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    rws_check.open_and_load_json(url)
+        mock_session_get.assert_called_once()
+
+    def test_http_cache_not_modified(self):
+        url = 'https://primary1.com' + WELL_KNOWN
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_file = os.path.join(cache_dir, 'http_cache.json')
+            rws_check = RwsCheck(rws_sites={},
+                         etlds=None,
+                         icanns=set(),
+                         http_cache_file=cache_file)
+            with mock.patch.object(rws_check.session, 'get') as mock_session_get:
+                mock_session_get.return_value.status_code = 200
+                mock_session_get.return_value.headers = {'ETag': '"v1"'}
+                mock_session_get.return_value.json.return_value = {
+                    "primary": "https://primary1.com"}
+                rws_check.open_and_load_json(url)
+            rws_check.save_http_cache()
+
+            rws_check = RwsCheck(rws_sites={},
+                         etlds=None,
+                         icanns=set(),
+                         http_cache_file=cache_file)
+            with mock.patch.object(rws_check.session, 'get') as mock_session_get:
+                mock_session_get.return_value.status_code = 304
+                self.assertEqual(rws_check.open_and_load_json(url),
+                                 {"primary": "https://primary1.com"})
+            mock_session_get.assert_called_once_with(
+                url, headers={'User-Agent': 'Chrome', 'If-None-Match': '"v1"'},
+                timeout=10)
+
+    def test_http_cache_missing_file(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            rws_check = RwsCheck(rws_sites={},
+                         etlds=None,
+                         icanns=set(),
+                         http_cache_file=os.path.join(cache_dir, 'absent.json'))
+        self.assertEqual(rws_check.http_cache, {})
+
+    def test_session_does_not_keep_cookies(self):
+        rws_check = RwsCheck(rws_sites={},
+                     etlds=None,
+                     icanns=set())
+        request = requests.Request('GET', 'https://service1.com').prepare()
+        headers = http.client.HTTPMessage()
+        headers['Set-Cookie'] = 'consent=1; Path=/'
+        response = mock.Mock()
+        response._original_response.msg = headers
+        extract_cookies_to_jar(rws_check.session.cookies, request, response)
+        next_request = rws_check.session.prepare_request(
+            requests.Request('GET', 'https://service1.com/ads.txt'))
+        self.assertEqual(len(rws_check.session.cookies), 0)
+        self.assertNotIn('Cookie', next_request.headers)
+
+    def test_http_cache_stale_entries_dropped(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_file = os.path.join(cache_dir, 'http_cache.json')
+            entry = {'etag': '"v1"', 'last_modified': None,
+                     'json': {"primary": "https://primary1.com"}}
+            with open(cache_file, 'w') as f:
+                json.dump({
+                    'https://fresh.com' + WELL_KNOWN:
+                        dict(entry, fetched=time.time()),
+                    'https://stale.com' + WELL_KNOWN:
+                        dict(entry, fetched=time.time() - 2 * 86400),
+                    'https://undated.com' + WELL_KNOWN: entry
+                }, f)
+            rws_check = RwsCheck(rws_sites={},
+                         etlds=None,
+                         icanns=set(),
+                         http_cache_file=cache_file)
+        self.assertEqual(list(rws_check.http_cache),
+                         ['https://fresh.com' + WELL_KNOWN])
+
+    def test_well_known_with_bom(self):
+        rws_check = RwsCheck(rws_sites={},
+                     etlds=None,
+                     icanns=set())
+        response = requests.Response()
+        response.status_code = 200
+        response._content = (codecs.BOM_UTF8 + 
+                             b'{"primary": "https://primary1.com"}')
+        with mock.patch.object(rws_check.session, 'get', 
+                               return_value=response):
+            self.assertEqual(rws_check.check_list_site(
+                "https://primary1.com", "https://associated1.com"), [])
+
 if __name__ == '__main__':
     unittest.main()